@@ -0,0 +1,503 @@
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+import tracemalloc
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+# -----------------------------
+# Configuration
+# -----------------------------
+DEFAULT_RESUMES = 100
+DEFAULT_QUERIES = 50
+DEFAULT_PARAGRAPHS = 3  # filler paragraphs per synthetic resume, to get realistic chunk counts
+BENCH_RESUME_ID_BASE = 2_100_000_000  # keeps benchmark rows apart from real ones in pgvector
+STAGES = ["generate", "chunk", "embed", "process", "store", "search", "analyze"]
+
+
+# -----------------------------
+# Synthetic corpus
+# -----------------------------
+class SyntheticResumeLoader:
+    """Faker resumes rendered to plain text, shaped like the other loaders' output."""
+
+    def __init__(self, num_resumes: int, paragraphs: int = DEFAULT_PARAGRAPHS, seed: int = 0):
+        self.num_resumes = num_resumes
+        self.paragraphs = paragraphs
+        self.seed = seed
+        self.latencies: List[float] = []
+
+    def load_resumes(self) -> List[Dict]:
+        from faker import Faker
+        from generate_resumes import fake_resume_data, render_text_resume
+
+        Faker.seed(self.seed)
+        random.seed(self.seed)
+        fake = Faker()
+
+        resumes = []
+        for i in range(self.num_resumes):
+            start = time.perf_counter()
+            data = fake_resume_data(fake)
+            text = render_text_resume(data)
+            filler = "\n".join(fake.paragraph(nb_sentences=5) for _ in range(self.paragraphs))
+            resumes.append({
+                "id": BENCH_RESUME_ID_BASE + i,
+                "category": data["job_title"][:100],
+                "text": f"{text}\n\nSummary\n{filler}",
+            })
+            self.latencies.append(time.perf_counter() - start)
+        return resumes
+
+
+def make_queries(num_queries: int, seed: int = 0) -> List[str]:
+    from faker import Faker
+    from generate_resumes import SKILLS
+
+    Faker.seed(seed + 1)
+    rng = random.Random(seed + 1)
+    fake = Faker()
+    return [
+        f"Looking for a {fake.job()} with experience in {', '.join(rng.sample(SKILLS, 3))}."
+        for _ in range(num_queries)
+    ]
+
+
+# -----------------------------
+# Offline backends
+# -----------------------------
+class HashingEmbedder:
+    """
+    Dependency-light stand-in for EmbeddingGenerator: hashes tokens into a
+    normalised vector of the same dimension. Use it to benchmark everything
+    around the model without downloading sentence-transformers weights.
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        from integration import EMBEDDING_DIM
+        self.dim = dim or EMBEDDING_DIM
+
+    def _embed(self, text: str):
+        import numpy as np
+
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            h = zlib.crc32(token.encode("utf-8"))
+            vec[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def embed_chunks(self, chunks: List[str]):
+        import numpy as np
+        return np.vstack([self._embed(c) for c in chunks])
+
+    def embed_query(self, query: str) -> List[float]:
+        return self._embed(query).tolist()
+
+
+SearchRow = namedtuple("SearchRow", "id resume_id category chunk_id text distance similarity")
+
+
+class InMemoryVectorStore:
+    """
+    In-process replacement for the resume_chunks table: same inputs as
+    store_chunks_in_db and same row shape and metric semantics as
+    search_similar_chunks, backed by a numpy matrix.
+    """
+
+    def __init__(self, embedder, metric: Optional[str] = None):
+        from integration import VECTOR_METRIC
+        self.embedder = embedder
+        self.metric = metric or VECTOR_METRIC
+        self.rows = []
+        self._blocks = []
+        self._matrix = None
+
+    def add(self, chunks):
+        import numpy as np
+
+        if not chunks:
+            return
+        for chunk in chunks:
+            self.rows.append((len(self.rows) + 1, chunk["resume_id"], chunk["category"], chunk["chunk_id"], chunk["text"]))
+        self._blocks.append(np.asarray([c["embedding"].tolist() for c in chunks], dtype=np.float32))
+        self._matrix = None
+
+    def search(self, query_text, top_k=5, min_similarity=None):
+        import numpy as np
+
+        if not self.rows:
+            return []
+        if self._matrix is None:
+            self._matrix = np.vstack(self._blocks)
+
+        query = np.asarray(self.embedder.embed_query(query_text), dtype=np.float32)
+        sims = self._matrix @ query
+        k = min(top_k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+
+        results = []
+        for idx in top:
+            sim = float(sims[idx])
+            if self.metric == "ip":
+                distance = -sim
+            elif self.metric == "cosine":
+                distance = 1 - sim
+            else:
+                distance = float(np.sqrt(max(0.0, 2 - 2 * sim)))
+            results.append(SearchRow(*self.rows[idx], distance, sim))
+
+        if min_similarity is not None:
+            results = [r for r in results if r.similarity >= min_similarity]
+        return results
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+def _max_rss_mb() -> Optional[float]:
+    """Highest RSS the process has reached so far (cumulative across stages)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):  # not Linux
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class RSSSampler:
+    """
+    Samples RSS in a background thread while a stage runs, so each stage gets
+    its own peak growth instead of inheriting the process-wide high-water mark.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = _current_rss_mb()
+        if self.start_mb is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, _current_rss_mb())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak_mb = max(self.peak_mb, _current_rss_mb())
+
+    @property
+    def delta_mb(self) -> Optional[float]:
+        return None if self.start_mb is None else self.peak_mb - self.start_mb
+
+
+def summarise(latencies: List[float], wall_seconds: float, count: Optional[int] = None) -> Dict:
+    from metrics import percentile
+
+    values = sorted(latencies)
+    count = len(values) if count is None else count
+    return {
+        "count": count,
+        "total_s": wall_seconds,
+        "throughput_per_s": count / wall_seconds if wall_seconds > 0 else None,
+        "p50_ms": percentile(values, 0.50) * 1000 if values else None,
+        "p95_ms": percentile(values, 0.95) * 1000 if values else None,
+        "p99_ms": percentile(values, 0.99) * 1000 if values else None,
+    }
+
+
+class StageRunner:
+    """Runs stages one after another, recording wall time and memory for each."""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.results: Dict[str, Dict] = {}
+
+    def run(self, name: str, fn):
+        """fn returns (per-item latencies, optional item count) and may record sub-stages itself."""
+        print(f"⏱️  Running stage '{name}'...")
+        if self.trace_memory:
+            tracemalloc.start()
+        with RSSSampler() as rss:
+            start = time.perf_counter()
+            latencies, count = fn()
+            wall = time.perf_counter() - start
+
+        result = summarise(latencies, wall, count)
+        result["rss_peak_delta_mb"] = rss.delta_mb
+        result["max_rss_mb"] = _max_rss_mb()
+        if self.trace_memory:
+            result["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        self.results[name] = result
+
+
+def _time_per_resume(processor, timings: List[Dict]):
+    """
+    Wrap the processor's chunker and embedder so each resume gets one
+    {"chunk", "embed"} entry. process() skips embedding for resumes without
+    chunks, so their entry keeps embed=None rather than shifting the pairing.
+    """
+    chunk_text = processor.chunker.chunk_text
+    embed_chunks = processor.embedder.embed_chunks
+
+    def timed_chunk(*args, **kwargs):
+        start = time.perf_counter()
+        result = chunk_text(*args, **kwargs)
+        timings.append({"chunk": time.perf_counter() - start, "embed": None})
+        return result
+
+    def timed_embed(*args, **kwargs):
+        start = time.perf_counter()
+        result = embed_chunks(*args, **kwargs)
+        timings[-1]["embed"] = time.perf_counter() - start
+        return result
+
+    processor.chunker.chunk_text = timed_chunk
+    processor.embedder.embed_chunks = timed_embed
+
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def run_benchmark(args) -> Dict:
+    import integration
+    from dataset_praser import ResumeProcessor, EmbeddingGenerator
+
+    embedder = HashingEmbedder() if args.embedder == "hash" else EmbeddingGenerator()
+    integration._embedder = embedder  # search_similar_chunks and /upload-resume reuse it
+
+    loader = SyntheticResumeLoader(args.resumes, args.paragraphs, args.seed)
+    queries = make_queries(args.queries, args.seed)
+    runner = StageRunner(args.trace_memory)
+
+    # Ingestion: ResumeProcessor.process end to end, with chunk/embed timed per resume
+    resumes = []
+
+    def generate_stage():
+        resumes.extend(loader.load_resumes())
+        return loader.latencies, None
+
+    runner.run("generate", generate_stage)
+
+    processor = ResumeProcessor(loader=_StaticLoader(resumes), embedder=embedder)
+    timings: List[Dict] = []
+    _time_per_resume(processor, timings)
+
+    chunks = []
+
+    def process_stage():
+        chunks.extend(processor.process())
+        # Per-resume latency is chunking plus embedding that resume
+        return [t["chunk"] + (t["embed"] or 0.0) for t in timings], len(resumes)
+
+    runner.run("process", process_stage)
+    chunk_latencies = [t["chunk"] for t in timings]
+    embed_latencies = [t["embed"] for t in timings if t["embed"] is not None]
+    runner.results["chunk"] = summarise(chunk_latencies, sum(chunk_latencies))
+    runner.results["embed"] = summarise(embed_latencies, sum(embed_latencies))
+    print(f"   {len(chunks)} chunks from {len(resumes)} resumes")
+
+    # Storage
+    if args.backend == "memory":
+        store = InMemoryVectorStore(embedder)
+        store_fn, search_fn = store.add, store.search
+    else:
+        from functools import partial
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        # Schema/index setup and the engine are one-off costs kept out of the
+        # timed stages, so "store" and "search" measure inserts and queries only
+        engine = create_engine(integration.DATABASE_URL)
+        integration.init_db(engine)
+        session = sessionmaker(bind=engine)()
+        store_fn = partial(integration.insert_chunks, session)
+        search_fn = partial(integration.search_similar_chunks, engine=engine)
+
+    by_resume: Dict[int, List[Dict]] = {}
+    for chunk in chunks:
+        by_resume.setdefault(chunk["resume_id"], []).append(chunk)
+
+    def store_stage():
+        latencies = []
+        for batch in by_resume.values():
+            start = time.perf_counter()
+            store_fn(batch)
+            latencies.append(time.perf_counter() - start)
+        return latencies, None
+
+    runner.run("store", store_stage)
+
+    # Retrieval
+    def search_stage():
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            search_fn(query, top_k=args.top_k)
+            latencies.append(time.perf_counter() - start)
+        return latencies, None
+
+    runner.run("search", search_stage)
+
+    # /analyze through the FastAPI app, stub LLM, fresh session per query
+    import RAG_chatbot
+    import metadata_api
+    from fastapi.testclient import TestClient
+    from metrics import request_metrics
+
+    RAG_chatbot.search_similar_chunks = search_fn
+    client = TestClient(metadata_api.app)
+    request_metrics.reset()
+
+    def analyze_stage():
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            response = client.post("/analyze", data={"input_text": query})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        return latencies, None
+
+    runner.run("analyze", analyze_stage)
+    metadata_api.sessions.clear()
+
+    if args.backend == "pgvector":
+        session.close()
+        if args.cleanup:
+            _delete_benchmark_rows()
+
+    return {
+        "config": vars(args),
+        "stages": {name: runner.results[name] for name in STAGES if name in runner.results},
+        "analyze_breakdown": request_metrics.summary(),
+    }
+
+
+class _StaticLoader:
+    def __init__(self, resumes):
+        self.resumes = resumes
+
+    def load_resumes(self):
+        return self.resumes
+
+
+def _delete_benchmark_rows():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from integration import DATABASE_URL, ResumeChunk
+
+    session = sessionmaker(bind=create_engine(DATABASE_URL))()
+    deleted = session.query(ResumeChunk).filter(ResumeChunk.resume_id >= BENCH_RESUME_ID_BASE).delete()
+    session.commit()
+    session.close()
+    print(f"🧹 Removed {deleted} benchmark chunks from PostgreSQL.")
+
+
+# -----------------------------
+# Reporting
+# -----------------------------
+def _fmt(value, spec=".2f"):
+    return "-" if value is None else format(value, spec)
+
+
+def print_report(report: Dict):
+    print(f"\n{'stage':<10} {'count':>7} {'items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS +MB':>9} {'max RSS MB':>11}")
+    for name, r in report["stages"].items():
+        print(
+            f"{name:<10} {r['count']:>7} {_fmt(r['throughput_per_s'], '.1f'):>10} {_fmt(r['p50_ms']):>9} "
+            f"{_fmt(r['p95_ms']):>9} {_fmt(r['p99_ms']):>9} {_fmt(r.get('rss_peak_delta_mb'), '.1f'):>9} {_fmt(r.get('max_rss_mb'), '.1f'):>11}"
+            + (f"  (traced peak {r['traced_peak_mb']:.1f} MB)" if "traced_peak_mb" in r else "")
+        )
+
+    if report["analyze_breakdown"]:
+        print("\n/analyze breakdown:")
+        for name, r in sorted(report["analyze_breakdown"].items()):
+            print(f"  {name:<22} p50 {r['p50'] * 1000:8.2f} ms   p95 {r['p95'] * 1000:8.2f} ms")
+
+
+def compare_to_baseline(report: Dict, baseline_path: str, tolerance: float) -> List[str]:
+    """Stages whose p95 latency grew by more than `tolerance` relative to the baseline run."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for name, r in report["stages"].items():
+        old = baseline.get("stages", {}).get(name, {}).get("p95_ms")
+        new = r.get("p95_ms")
+        if old and new and new > old * (1 + tolerance):
+            regressions.append(f"{name}: p95 {old:.2f} ms -> {new:.2f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, retrieval and /analyze on a synthetic corpus.")
+    parser.add_argument("--resumes", type=int, default=DEFAULT_RESUMES, help="number of synthetic resumes")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES, help="number of search / analyze queries")
+    parser.add_argument("--paragraphs", type=int, default=DEFAULT_PARAGRAPHS, help="filler paragraphs per resume")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["memory", "pgvector"], default="memory",
+                        help="in-process vector store, or the PostgreSQL database from .env")
+    parser.add_argument("--embedder", choices=["minilm", "hash"], default="minilm",
+                        help="real sentence-transformer, or a hashing embedder that needs no model download")
+    parser.add_argument("--llm", choices=["stub", "gemini"], default="stub")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated stub LLM latency in seconds")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report Python-level peak allocations per stage (slows the run)")
+    parser.add_argument("--cleanup", action="store_true", help="delete benchmark rows from PostgreSQL afterwards")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    parser.add_argument("--baseline", help="JSON report to compare against; exit 1 on p95 regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth vs baseline (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Must be set before the project modules read their configuration
+    os.environ["LLM_BACKEND"] = args.llm
+    os.environ["LLM_STUB_LATENCY"] = str(args.llm_latency)
+    os.environ["ENABLE_METRICS"] = "1"
+
+    report = run_benchmark(args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\n✅ No p95 regressions against baseline.")
@@ -1,15 +1,9 @@
 import os
 from typing import List, Dict
 
-import pandas as pd
-import kagglehub
-import nltk
-from nltk.tokenize import TreebankWordTokenizer
-from tqdm import tqdm
-from sentence_transformers import SentenceTransformer
-import os
-import fitz  # PyMuPDF
-from typing import List, Dict
+# Heavy dependencies (pandas, kagglehub, nltk, sentence_transformers, PyMuPDF, tqdm)
+# are imported inside the classes that use them, so importing this module from the
+# API stays cheap and each one is only loaded on first use.
 
 
 
@@ -19,6 +13,8 @@ class DatasetDownloader:
         self.dataset_id = dataset_id
 
     def get_csv_path(self) -> str:
+        import kagglehub
+
         print("📦 Downloading Kaggle resume dataset...")
         path = kagglehub.dataset_download(self.dataset_id)
         print(f"✅ Dataset downloaded to: {path}")
@@ -36,6 +32,8 @@ class ResumeCSVLoader:
         self.csv_path = csv_path
 
     def load_resumes(self) -> List[Dict]:
+        import pandas as pd
+
         df = pd.read_csv(self.csv_path)
         resumes = []
         for idx, row in df.iterrows():
@@ -65,6 +63,8 @@ class PDFResumeLoader:
         return resumes
 
     def _extract_text(self, pdf_path: str) -> str:
+        import fitz  # PyMuPDF
+
         doc = fitz.open(pdf_path)
         full_text = ""
         for page in doc:
@@ -77,6 +77,8 @@ class TextChunker:
     def __init__(self, chunk_size: int = 300, overlap: int = 100):
         self.chunk_size = chunk_size
         self.overlap = overlap
+
+        from nltk.tokenize import TreebankWordTokenizer
         self.tokenizer = TreebankWordTokenizer()
 
     def chunk_text(self, text: str) -> List[str]:
@@ -92,16 +94,27 @@ class TextChunker:
 
 
 class EmbeddingGenerator:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    """Encodes text into unit-length vectors so inner product == cosine similarity."""
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', normalize: bool = True):
+        from sentence_transformers import SentenceTransformer
+
         self.model = SentenceTransformer(model_name)
+        self.normalize = normalize
 
     def embed_chunks(self, chunks: List[str]):
-        return self.model.encode(chunks, convert_to_tensor=True)
+        return self.model.encode(chunks, convert_to_tensor=True, normalize_embeddings=self.normalize)
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.model.encode(query, normalize_embeddings=self.normalize).tolist()
 
 
 class ResumeProcessor:
-    def __init__(self, source: str = "csv"):
-        if source == "csv":
+    def __init__(self, source: str = "csv", loader=None, embedder=None):
+        # An explicit loader/embedder (e.g. synthetic data in benchmarks) bypasses the source lookup
+        if loader is not None:
+            self.loader = loader
+        elif source == "csv":
             downloader = DatasetDownloader()
             csv_path = downloader.get_csv_path()
             self.loader = ResumeCSVLoader(csv_path)
@@ -111,9 +124,11 @@ class ResumeProcessor:
             raise ValueError("Source must be 'csv' or 'pdf'.")
 
         self.chunker = TextChunker()
-        self.embedder = EmbeddingGenerator()
+        self.embedder = embedder or EmbeddingGenerator()
 
     def process(self):
+        from tqdm import tqdm
+
         all_chunks = []
         resumes = self.loader.load_resumes()
 
@@ -137,6 +152,7 @@ class ResumeProcessor:
 
 
 if __name__ == "__main__":
+    import nltk
     nltk.download("punkt")  
 
     processor = ResumeProcessor()
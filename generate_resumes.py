@@ -10,65 +10,89 @@ OUTPUT_DIR = "generated_resumes"
 TEMPLATE_FILE = "resume_template.tex"
 # ==========================
 
-# Create output folder if it doesn't exist
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+SKILLS = [
+    "Python", "SQL", "Java", "JavaScript", "React", "Docker", "Kubernetes", "AWS",
+    "Machine Learning", "Data Analysis", "Excel", "Project Management", "Communication",
+    "Leadership", "Linux", "Git", "Tableau", "C++", "Django", "Agile",
+]
 
-# Initialize Faker
-fake = Faker()
 
-# Load LaTeX template
-with open(TEMPLATE_FILE, 'r') as f:
-    latex_template = Template(f.read())
-
-# Generate resumes
-for i in range(1, NUM_RESUMES + 1):
+def fake_resume_data(fake: Faker) -> dict:
+    """Random characteristics for one resume, as expected by resume_template.tex."""
     name = fake.name()
-    email = fake.email()
-    phone = fake.phone_number()
-    linkedin = f"linkedin.com/in/{name.lower().replace(' ', '')}"
-    job_title = fake.job()
-    company = fake.company()
-    location = fake.city()
-    dates = f"{random.randint(2019, 2022)}–Present"
-    job_description = fake.sentence(nb_words=10)
-    degree = "B.Sc. in Computer Science"
-    university = f"{fake.last_name()} University"
-    graduation_date = fake.date(pattern="%B %Y")
-
-    data = {
+    return {
         "name": name,
-        "email": email,
-        "phone": phone,
-        "linkedin": linkedin,
-        "job_title": job_title,
-        "company": company,
-        "location": location,
-        "dates": dates,
-        "job_description": job_description,
-        "degree": degree,
-        "university": university,
-        "graduation_date": graduation_date
+        "email": fake.email(),
+        "phone": fake.phone_number(),
+        "linkedin": f"linkedin.com/in/{name.lower().replace(' ', '')}",
+        "job_title": fake.job(),
+        "company": fake.company(),
+        "location": fake.city(),
+        "dates": f"{random.randint(2019, 2022)}–Present",
+        "job_description": fake.sentence(nb_words=10),
+        "degree": "B.Sc. in Computer Science",
+        "university": f"{fake.last_name()} University",
+        "graduation_date": fake.date(pattern="%B %Y"),
+        "skills": random.sample(SKILLS, 5),
     }
 
-    # Render LaTeX
-    tex_code = latex_template.render(data)
-    tex_filename = os.path.join(OUTPUT_DIR, f"resume_{i}.tex")
 
-    # Write .tex file
-    with open(tex_filename, "w") as f:
-        f.write(tex_code)
+def render_text_resume(data: dict) -> str:
+    """Plain-text resume (no pdflatex needed): the LaTeX template's sections plus a Skills list."""
+    return "\n".join([
+        data["name"],
+        f"{data['email']} | {data['phone']} | {data['linkedin']}",
+        "",
+        "Experience",
+        f"{data['job_title']} at {data['company']}, {data['location']} ({data['dates']})",
+        data["job_description"],
+        "",
+        "Education",
+        f"{data['degree']}, {data['university']}, {data['graduation_date']}",
+        "",
+        "Skills",
+        ", ".join(data["skills"]),
+    ])
+
+
+def generate_pdf_resumes(num_resumes: int = NUM_RESUMES, output_dir: str = OUTPUT_DIR, template_file: str = TEMPLATE_FILE):
+    # Create output folder if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Initialize Faker
+    fake = Faker()
+
+    # Load LaTeX template
+    with open(template_file, 'r') as f:
+        latex_template = Template(f.read())
+
+    # Generate resumes
+    for i in range(1, num_resumes + 1):
+        data = fake_resume_data(fake)
+
+        # Render LaTeX
+        tex_code = latex_template.render(data)
+        tex_filename = os.path.join(output_dir, f"resume_{i}.tex")
+
+        # Write .tex file
+        with open(tex_filename, "w") as f:
+            f.write(tex_code)
+
+        subprocess.run([
+            "/Library/TeX/texbin/pdflatex",
+            "-output-directory", output_dir,
+            tex_filename
+        ], check=False)
+
 
-    subprocess.run([
-        "/Library/TeX/texbin/pdflatex",
-        "-output-directory", OUTPUT_DIR,
-        tex_filename
-    ], check=False)
+        # Clean up aux/log/tex
+        for ext in [".aux", ".log", ".tex"]:
+            path = os.path.join(output_dir, f"resume_{i}{ext}")
+            if os.path.exists(path):
+                os.remove(path)
 
+        print(f"✅ Saved resume_{i}.pdf in {output_dir}/")
 
-    # Clean up aux/log/tex
-    for ext in [".aux", ".log", ".tex"]:
-        path = os.path.join(OUTPUT_DIR, f"resume_{i}{ext}")
-        if os.path.exists(path):
-            os.remove(path)
 
-    print(f"✅ Saved resume_{i}.pdf in {OUTPUT_DIR}/")
+if __name__ == "__main__":
+    generate_pdf_resumes()
@@ -0,0 +1,83 @@
+import re
+import subprocess
+import sys
+
+# -----------------------------
+# Configuration
+# -----------------------------
+TARGET_MODULE = "metadata_api"
+TOP_N = 15
+MAX_IMPORT_SECONDS = 1.0
+
+# Dependencies that must only be imported on first use, never when the API boots
+HEAVY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "pandas",
+    "kagglehub",
+    "nltk",
+    "fitz",
+    "tqdm",
+    "google.generativeai",
+]
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+# -----------------------------
+# Profiling
+# -----------------------------
+def profile_imports(module: str = TARGET_MODULE):
+    """
+    Import `module` in a fresh interpreter with -X importtime and return
+    (entries, loaded_heavy) where entries are (cumulative_us, self_us, depth, name).
+    """
+    code = (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((int(cumulative_us), int(self_us), len(indent) // 2, name))
+
+    loaded_heavy = [m for m in proc.stdout.strip().split(",") if m]
+    return entries, loaded_heavy
+
+
+def report(module: str = TARGET_MODULE, top_n: int = TOP_N, max_seconds: float = MAX_IMPORT_SECONDS) -> bool:
+    entries, loaded_heavy = profile_imports(module)
+    total = next((cum for cum, _, _, name in entries if name == module), 0) / 1e6
+
+    print(f"⏱️  Import profile for '{module}': {total:.3f}s total\n")
+    print(f"{'cumulative':>11} {'self':>9}  module")
+    # Top-level packages only, so one slow dependency isn't listed once per submodule
+    top_level = [e for e in entries if e[2] <= 1 and "." not in e[3]]
+    for cum, self_us, _, name in sorted(top_level, reverse=True)[:top_n]:
+        print(f"{cum / 1e6:>10.3f}s {self_us / 1e6:>8.3f}s  {name}")
+
+    ok = True
+    if loaded_heavy:
+        print(f"\n❌ Heavy modules imported at startup: {', '.join(loaded_heavy)}")
+        ok = False
+    if total > max_seconds:
+        print(f"\n❌ Import took {total:.3f}s, budget is {max_seconds:.1f}s")
+        ok = False
+    if ok:
+        print(f"\n✅ Import within {max_seconds:.1f}s budget and no heavy modules loaded.")
+    return ok
+
+
+if __name__ == "__main__":
+    module = sys.argv[1] if len(sys.argv) > 1 else TARGET_MODULE
+    sys.exit(0 if report(module) else 1)
@@ -1,8 +1,8 @@
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Text
+import threading
+from sqlalchemy import create_engine, Column, Integer, String, Text, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 from pgvector.sqlalchemy import Vector
-from dataset_praser import ResumeProcessor  # import your previous module
 
 # -----------------------------
 # 1. Configure DB connection
@@ -20,6 +20,39 @@ DB_NAME = os.getenv("PGDATABASE")
 
 DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# -----------------------------
+# Vector metric configuration
+# -----------------------------
+# Embeddings are stored L2-normalised, so "ip" (inner product) ranks exactly like
+# cosine but is the cheapest operator for the HNSW index.
+EMBEDDING_DIM = 384  # MiniLM
+
+VECTOR_METRICS = {
+    # metric: (distance operator, index opclass)
+    "cosine": ("<=>", "vector_cosine_ops"),
+    "ip": ("<#>", "vector_ip_ops"),
+    "l2": ("<->", "vector_l2_ops"),
+}
+
+VECTOR_METRIC = os.getenv("VECTOR_METRIC", "ip").lower()
+if VECTOR_METRIC not in VECTOR_METRICS:
+    raise ValueError(f"🚨 VECTOR_METRIC must be one of {sorted(VECTOR_METRICS)}, got '{VECTOR_METRIC}'")
+
+DISTANCE_OPERATOR, INDEX_OPCLASS = VECTOR_METRICS[VECTOR_METRIC]
+
+
+def vector_index_name(metric: str = VECTOR_METRIC) -> str:
+    return f"resume_chunks_embedding_{metric}_idx"
+
+
+def similarity_sql(distance_expr: str, metric: str = VECTOR_METRIC) -> str:
+    """SQL expression turning a pgvector distance into a similarity in [-1, 1] for unit vectors."""
+    if metric == "cosine":
+        return f"1 - ({distance_expr})"
+    if metric == "ip":
+        return f"-1 * ({distance_expr})"  # <#> returns the negative inner product
+    return f"1 - power({distance_expr}, 2) / 2"  # ||a - b||^2 = 2 - 2cos for unit vectors
+
 
 from sqlalchemy.dialects.postgresql import ARRAY
 
@@ -50,17 +83,39 @@ class ResumeChunk(Base):
     category = Column(String(100))
     chunk_id = Column(Integer)
     text = Column(Text)
-    embedding = Column(Vector(384))  # 384-dimensional vector for MiniLM
+    embedding = Column(Vector(EMBEDDING_DIM))  # 384-dimensional vector for MiniLM
+
+
+def init_db(engine):
+    """
+    Create the pgvector extension, tables and the ANN index for the configured metric.
+
+    The index is created explicitly rather than declared on the model, because
+    create_all only emits CREATE INDEX for tables it creates itself, so existing
+    databases (or a changed VECTOR_METRIC) would never get it. Indexes for the
+    other metrics are dropped, since searches no longer use them.
+
+    This is one-off setup (the `init`, `insert` and `migrate` CLI modes): building
+    the index can take a while on a large table and the DDL is not safe to run
+    from concurrent API workers, so it never runs on the write path.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for metric in VECTOR_METRICS:
+            if metric != VECTOR_METRIC:
+                conn.execute(text(f"DROP INDEX IF EXISTS {vector_index_name(metric)}"))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {vector_index_name()} "
+            f"ON resume_chunks USING hnsw (embedding {INDEX_OPCLASS})"
+        ))
 
 # -----------------------------
 # 3. Store chunks in DB
 # -----------------------------
-def store_chunks_in_db(chunks):
-    engine = create_engine(DATABASE_URL)
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
+def insert_chunks(session, chunks):
+    """Add and commit chunk rows on an existing session (no schema work)."""
     for chunk in chunks:
         record = ResumeChunk(
             resume_id=chunk["resume_id"],
@@ -72,6 +127,16 @@ def store_chunks_in_db(chunks):
         session.add(record)
 
     session.commit()
+
+
+def store_chunks_in_db(chunks, engine=None):
+    engine = engine or create_engine(DATABASE_URL)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    insert_chunks(session, chunks)
+
     session.close()
     print(f"✅ Inserted {len(chunks)} chunks into PostgreSQL.")
 
@@ -79,21 +144,41 @@ def store_chunks_in_db(chunks):
 # -----------------------------
 # 4. Search for top‑K matches
 # -----------------------------
-def search_similar_chunks(query_text, top_k=5):
-    from sentence_transformers import SentenceTransformer
-    from sqlalchemy import text
+_embedder = None
+_embedder_lock = threading.Lock()
 
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    query_embedding = model.encode(query_text).tolist()
 
-    engine = create_engine(DATABASE_URL)
+def get_embedder():
+    """Load the sentence-transformer once per process instead of on every search."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            from dataset_praser import EmbeddingGenerator
+            _embedder = EmbeddingGenerator()
+    return _embedder
+
+
+def search_similar_chunks(query_text, top_k=5, min_similarity=None, engine=None):
+    """
+    Return the top_k chunks closest to query_text under VECTOR_METRIC.
+
+    Each row carries both the raw pgvector `distance` and a normalised
+    `similarity` (cosine, since stored and query vectors are unit length).
+    Rows below `min_similarity` are dropped when a threshold is given.
+    """
+    query_embedding = get_embedder().embed_query(query_text)
+
+    engine = engine or create_engine(DATABASE_URL)
     Session = sessionmaker(bind=engine)
     session = Session()
 
-    query_sql = text("""
-        SELECT id, resume_id, category, chunk_id, text, embedding <#> CAST(:query AS vector) AS distance
+    distance = f"embedding {DISTANCE_OPERATOR} CAST(:query AS vector)"
+    query_sql = text(f"""
+        SELECT id, resume_id, category, chunk_id, text,
+               {distance} AS distance,
+               {similarity_sql(distance)} AS similarity
         FROM resume_chunks
-        ORDER BY embedding <#> CAST(:query AS vector)
+        ORDER BY {distance}
         LIMIT :top_k
     """)
 
@@ -101,10 +186,57 @@ def search_similar_chunks(query_text, top_k=5):
 
     session.close()
 
+    if min_similarity is not None:
+        results = [r for r in results if r.similarity >= min_similarity]
+
     return results
 
+
+# -----------------------------
+# 5. Re-normalise stored embeddings
+# -----------------------------
+def renormalize_embeddings(batch_size=500):
+    """
+    One-off migration: rescale every stored embedding to unit length so rows
+    written before normalisation was introduced score consistently.
+    """
+    import numpy as np
+
+    engine = create_engine(DATABASE_URL)
+    init_db(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (
+            session.query(ResumeChunk.id, ResumeChunk.embedding)
+            .filter(ResumeChunk.id > last_id)
+            .order_by(ResumeChunk.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        for row_id, embedding in rows:
+            vec = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            if norm > 0 and not np.isclose(norm, 1.0, atol=1e-4):
+                session.query(ResumeChunk).filter(ResumeChunk.id == row_id).update(
+                    {ResumeChunk.embedding: (vec / norm).tolist()}, synchronize_session=False
+                )
+                updated += 1
+
+        session.commit()
+        last_id = rows[-1][0]
+
+    session.close()
+    print(f"✅ Re-normalised {updated} embeddings.")
+
 # -----------------------------
-# 5. Run insert and/or search
+# 6. Run insert, init, search and/or migrate
 # -----------------------------
 if __name__ == "__main__":
     import sys
@@ -112,15 +244,25 @@ if __name__ == "__main__":
     mode = sys.argv[1] if len(sys.argv) > 1 else "insert"
 
     if mode == "insert":
+        from dataset_praser import ResumeProcessor
         from nltk import download
         download("punkt")  # Ensure tokenizer works
         processor = ResumeProcessor()
         chunks = processor.process()
-        store_chunks_in_db(chunks)
+        engine = create_engine(DATABASE_URL)
+        init_db(engine)
+        store_chunks_in_db(chunks, engine)
+
+    elif mode == "init":
+        init_db(create_engine(DATABASE_URL))
+        print(f"✅ Database ready with the '{VECTOR_METRIC}' vector index.")
 
     elif mode == "search":
         query = input("Enter a job description or query: ")
         results = search_similar_chunks(query)
         for res in results:
-            print(f"[Resume {res.resume_id}] ({res.category}) — Distance: {res.distance:.4f}\n{res.text[:300]}...\n")
+            print(f"[Resume {res.resume_id}] ({res.category}) — Similarity: {res.similarity:.4f}\n{res.text[:300]}...\n")
+
+    elif mode == "migrate":
+        renormalize_embeddings()
 
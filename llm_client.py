@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import random
+import hashlib
+import re
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from prompt_builder import count_tokens
+from metrics import percentile
+
+load_dotenv()
+
+# -----------------------------
+# Configuration
+# -----------------------------
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()  # "gemini" or "stub"
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20.0"))
+LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0"))  # seconds, to mimic a real model under load
+
+
+class LLMConfigError(ValueError):
+    """Raised for problems that retrying cannot fix (missing key, unknown backend)."""
+
+
+class LLMResponseError(ValueError):
+    """Raised when the model answers without usable text (e.g. a blocked response)."""
+
+
+class TransientLLMError(RuntimeError):
+    """Backend-agnostic marker for failures worth retrying (rate limits, outages)."""
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+        self.transient_errors = (TransientLLMError,)
+
+    def _get_model(self):
+        # Configure on first use so that importing callers never needs the key
+        with self._lock:
+            if self._model is None:
+                api_key = os.getenv("GOOGLE_API_KEY")
+                if not api_key:
+                    raise LLMConfigError("🚨 Missing GOOGLE_API_KEY in your .env file")
+                import google.generativeai as genai
+                from google.api_core import exceptions as google_exceptions
+                genai.configure(api_key=api_key)
+                # Only rate limits, timeouts and server-side failures are retried;
+                # InvalidArgument, PermissionDenied and the like fail straight away
+                self.transient_errors = (
+                    TransientLLMError,
+                    google_exceptions.ResourceExhausted,
+                    google_exceptions.ServiceUnavailable,
+                    google_exceptions.DeadlineExceeded,
+                    google_exceptions.InternalServerError,
+                )
+                self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt: str, caller: str = "default") -> Dict:
+        response = self._get_model().generate_content(prompt)
+        try:
+            # .text raises ValueError when the candidate was blocked or is empty
+            text = response.text
+        except (AttributeError, ValueError) as e:
+            raise LLMResponseError(f"Invalid response format: {e}") from e
+
+        usage = getattr(response, "usage_metadata", None)
+        return {
+            "text": text,
+            "prompt_tokens": getattr(usage, "prompt_token_count", None),
+            "output_tokens": getattr(usage, "candidates_token_count", None),
+        }
+
+
+class StubBackend:
+    """
+    Deterministic offline backend: the same prompt always gives the same answer.
+    Callers in JSON_CALLERS get a metadata-shaped object, everything else gets a
+    short summary naming the resumes found in the prompt.
+    """
+    name = "stub"
+    transient_errors = (TransientLLMError,)
+
+    JSON_CALLERS = {"metadata_extraction"}
+
+    JOB_TITLES = ["Software Engineer", "Data Scientist", "Project Manager", "DevOps Engineer", "Designer"]
+    SKILLS = ["python", "sql", "java", "aws", "docker", "react", "excel", "communication"]
+    LOCATIONS = ["London", "Berlin", "New York", "Bucharest", "Remote"]
+
+    def __init__(self, latency: float = LLM_STUB_LATENCY):
+        self.latency = latency
+
+    def generate(self, prompt: str, caller: str = "default") -> Dict:
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        rng = random.Random(digest)
+        if self.latency:
+            time.sleep(self.latency)
+
+        if caller in self.JSON_CALLERS:
+            text = json.dumps({
+                "job_title": rng.choice(self.JOB_TITLES),
+                "skills": rng.sample(self.SKILLS, 3),
+                "years_experience": rng.randint(0, 15),
+                "location": rng.choice(self.LOCATIONS),
+            })
+        else:
+            resume_ids = list(dict.fromkeys(re.findall(r"\[Resume (\d+)\]", prompt)))
+            if resume_ids:
+                picks = resume_ids[: rng.randint(1, len(resume_ids))]
+                text = " ".join(f"Resume {rid} matches the key requirements." for rid in picks)
+            else:
+                text = "No resume in the provided context matches the job requirements."
+
+        return {"text": text, "prompt_tokens": None, "output_tokens": None}
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "stub": StubBackend,
+}
+
+
+# -----------------------------
+# Client
+# -----------------------------
+class LLMClient:
+    """
+    Shared entry point for text generation.
+
+    - identical prompts already in flight are coalesced into one backend call
+    - at most `max_concurrency` backend calls run at once
+    - transient failures are retried with full-jitter exponential backoff
+    - latency, token and retry counts are tracked per caller
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = LLM_RETRY_BASE_DELAY,
+        max_delay: float = LLM_RETRY_MAX_DELAY,
+    ):
+        if backend is None:
+            if LLM_BACKEND not in BACKENDS:
+                raise LLMConfigError(f"🚨 LLM_BACKEND must be one of {sorted(BACKENDS)}, got '{LLM_BACKEND}'")
+            backend = BACKENDS[LLM_BACKEND]()
+        self.backend = backend
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = defaultdict(self._empty_metrics)
+
+    @staticmethod
+    def _empty_metrics():
+        return {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "coalesced": 0,
+            "prompt_tokens": 0,
+            "output_tokens": 0,
+            "latencies": deque(maxlen=1000),
+        }
+
+    def generate(self, prompt: str, caller: str = "default") -> str:
+        # The caller is part of the key because backends may shape replies per caller
+        key = hashlib.sha256(f"{caller}\0{prompt}".encode("utf-8")).hexdigest()
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            self._record(caller, coalesced=1)
+            return future.result()
+
+        start = time.perf_counter()
+        try:
+            result = self._generate_with_retry(prompt, caller)
+        except Exception as e:
+            self._record(caller, calls=1, errors=1, latency=time.perf_counter() - start)
+            future.set_exception(e)
+            raise
+        else:
+            self._record(
+                caller,
+                calls=1,
+                latency=time.perf_counter() - start,
+                prompt_tokens=result["prompt_tokens"] or count_tokens(prompt),
+                output_tokens=result["output_tokens"] or count_tokens(result["text"]),
+            )
+            future.set_result(result["text"])
+            return result["text"]
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _generate_with_retry(self, prompt: str, caller: str) -> Dict:
+        attempt = 0
+        while True:
+            try:
+                with self._semaphore:
+                    return self.backend.generate(prompt, caller)
+            except Exception as e:
+                transient = isinstance(e, getattr(self.backend, "transient_errors", (TransientLLMError,)))
+                if not transient or attempt >= self.max_retries:
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                self._record(caller, retries=1)
+                attempt += 1
+                time.sleep(delay)
+
+    def _record(self, caller: str, latency: Optional[float] = None, **counts):
+        with self._metrics_lock:
+            m = self._metrics[caller]
+            for name, value in counts.items():
+                m[name] += value
+            if latency is not None:
+                m["latencies"].append(latency)
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Per-caller counters plus latency percentiles (seconds) over the last 1000 calls."""
+        report = {}
+        with self._metrics_lock:
+            for caller, m in self._metrics.items():
+                latencies = sorted(m["latencies"])
+                entry = {k: v for k, v in m.items() if k != "latencies"}
+                entry["backend"] = self.backend.name
+                for label, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+                    entry[f"latency_{label}"] = percentile(latencies, q)
+                report[caller] = entry
+        return report
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Process-wide client so coalescing, concurrency limits and metrics are shared."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+    return _client
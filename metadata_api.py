@@ -5,14 +5,18 @@ from sqlalchemy import create_engine, any_
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
+import time
 import uuid
+import threading
 from fastapi import File
-from integration import store_chunks_in_db
-from dataset_praser import TextChunker, EmbeddingGenerator
+from integration import store_chunks_in_db, get_embedder
+from dataset_praser import TextChunker
 
 # Import from your other Python files
 from integration import ResumeMetadata, Base
 from RAG_chatbot import answer_with_rag, ConversationManager  # ✅ Use your existing logic
+from llm_client import get_llm_client
+from metrics import METRICS_ENABLED, request_metrics
 
 # -------------------------
 # Setup
@@ -32,6 +36,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if METRICS_ENABLED:
+    @app.middleware("http")
+    async def time_requests(request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        # Label by route template so unknown paths don't each get their own entry
+        route = request.scope.get("route")
+        name = f"{request.method} {route.path if route else 'unmatched'}"
+        request_metrics.record(name, time.perf_counter() - start)
+        return response
+
+    @app.get("/metrics")
+    def get_metrics():
+        return {"requests": request_metrics.summary(), "llm": get_llm_client().metrics()}
+
+@app.on_event("startup")
+def preload_models():
+    # The embedding model is loaded lazily on first use. Set PRELOAD_EMBEDDER=1 to
+    # warm it in the background instead, without delaying the worker's boot.
+    if os.getenv("PRELOAD_EMBEDDER", "0") == "1":
+        threading.Thread(target=get_embedder, daemon=True).start()
+
 # -------------------------
 # Routes
 # -------------------------
@@ -78,8 +104,11 @@ def get_resumes(
 
 sessions = {}
 
+# Plain def so FastAPI runs it in the threadpool: the LLM call (and its retry
+# backoff) blocks, and concurrent requests must reach the LLM client in parallel
+# for coalescing and the concurrency limit to apply
 @app.post("/analyze")
-async def analyze(input_text: str = Form(...), session_id: str = Form(None)):
+def analyze(input_text: str = Form(...), session_id: str = Form(None)):
     # Initialize or retrieve conversation
     if not session_id or session_id not in sessions:
         session_id = str(uuid.uuid4())
@@ -171,8 +200,7 @@ async def upload_resume(file: UploadFile = File(...)):
     if not chunks:
         return {"error": "Resume could not be chunked. Empty or invalid."}
 
-    embedder = EmbeddingGenerator()
-    embeddings = embedder.embed_chunks(chunks)
+    embeddings = get_embedder().embed_chunks(chunks)
 
     chunk_records = []
     for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
@@ -3,7 +3,7 @@
 import os
 import json
 from dotenv import load_dotenv
-import google.generativeai as genai
+from llm_client import get_llm_client
 from integration import ResumeMetadata, Base
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -17,10 +17,6 @@ engine = create_engine(DATABASE_URL)
 Session = sessionmaker(bind=engine)
 Base.metadata.create_all(engine)
 
-# Gemini setup
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel("gemini-1.5-flash-latest")
-
 def extract_metadata(resume_id, resume_text):
     prompt = f"""
 Extract the following metadata from this resume in JSON format:
@@ -37,14 +33,12 @@ Respond ONLY with valid JSON without ```json .
 """
 
     try:
-        response = model.generate_content(prompt)
+        raw = get_llm_client().generate(prompt, caller="metadata_extraction").strip()
 
-        if not response or not hasattr(response, "text"):
+        if not raw:
             print(f"⚠️ Empty or malformed response for resume {resume_id}")
             return None
 
-        raw = response.text.strip()
-
         # Try to parse JSON, fallback if needed
         try:
             data = json.loads(raw)
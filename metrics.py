@@ -0,0 +1,75 @@
+import os
+import time
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Per-request timing is opt-in: it costs a lock and a deque append per measurement
+METRICS_ENABLED = os.getenv("ENABLE_METRICS", "0") == "1"
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list (q in [0, 1])."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class LatencyRecorder:
+    """Thread-safe store of the last `maxlen` latencies (seconds) per name."""
+
+    def __init__(self, maxlen: int = 1000):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+        self._samples = defaultdict(lambda: deque(maxlen=maxlen))
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self._counts[name] += 1
+            self._samples[name].append(seconds)
+
+    @contextmanager
+    def time(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, Dict]:
+        report = {}
+        with self._lock:
+            for name, samples in self._samples.items():
+                values = sorted(samples)
+                report[name] = {
+                    "count": self._counts[name],
+                    "mean": sum(values) / len(values),
+                    "p50": percentile(values, 0.50),
+                    "p95": percentile(values, 0.95),
+                    "p99": percentile(values, 0.99),
+                    "max": values[-1],
+                }
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._samples.clear()
+
+
+request_metrics = LatencyRecorder()
+
+
+@contextmanager
+def timed(name: str):
+    """Record the block's duration in request_metrics when ENABLE_METRICS=1, otherwise do nothing."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    with request_metrics.time(name):
+        yield
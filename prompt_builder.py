@@ -0,0 +1,250 @@
+import os
+import re
+from typing import List, Dict, Optional
+
+# -----------------------------
+# Token counting
+# -----------------------------
+# Gemini's tokenizer is only reachable through an API call, so prompt sizing uses a
+# local estimate: words and punctuation marks each count as one token, and long
+# words are charged one extra token per 4 characters (roughly how subword
+# tokenizers split them). It errs on the high side, which is what a budget wants.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "we", "with", "you",
+    "our", "will", "who", "which", "their", "they", "your", "can", "should", "must",
+}
+
+ELLIPSIS = "..."
+CHUNK_SEPARATOR = "\n---\n"
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+
+
+def count_tokens(text: str) -> int:
+    return sum(1 + (len(tok) - 1) // 4 for tok in _TOKEN_RE.findall(text or ""))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary so that it fits in max_tokens."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    # The "..." marker costs 3 tokens and has to fit in the budget too
+    limit = max_tokens - count_tokens(ELLIPSIS)
+    if limit <= 0:
+        return ""
+
+    used = 0
+    end = 0
+    for match in _TOKEN_RE.finditer(text):
+        cost = 1 + (len(match.group()) - 1) // 4
+        if used + cost > limit:
+            break
+        used += cost
+        end = match.end()
+    return text[:end].rstrip() + ELLIPSIS
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if s.strip()]
+
+
+def _terms(text: str) -> set:
+    return {w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 1}
+
+
+def fair_shares(needs: List[int], budget: int) -> List[int]:
+    """
+    Split budget across items that need `needs[i]` each: small items get all
+    they need and whatever they leave over is shared by the larger ones.
+    """
+    shares = [0] * len(needs)
+    remaining = max(budget, 0)
+    order = sorted(range(len(needs)), key=lambda i: needs[i])
+    for n, i in enumerate(order):
+        shares[i] = min(needs[i], remaining // (len(order) - n))
+        remaining -= shares[i]
+    return shares
+
+
+# -----------------------------
+# Context compression
+# -----------------------------
+def select_sentences(text: str, query: str, max_tokens: int) -> str:
+    """
+    Keep the sentences of `text` that share the most terms with `query`, up to
+    max_tokens, and return them in their original order. Sentences with no
+    overlap are only used when nothing matches (the text is then kept from the
+    start). Selection stops at the first sentence that doesn't fit, so the
+    leftover budget never goes to a less relevant sentence.
+    """
+    sentences = split_sentences(text)
+    if not sentences or max_tokens <= 0:
+        return ""
+
+    query_terms = _terms(query)
+    scored = []
+    for idx, sentence in enumerate(sentences):
+        terms = _terms(sentence)
+        overlap = len(terms & query_terms)
+        # Normalise by length so long sentences don't win on size alone
+        score = overlap / (1 + len(terms)) ** 0.5
+        scored.append((score, idx, sentence))
+
+    if any(score > 0 for score, _, _ in scored):
+        scored = [item for item in scored if item[0] > 0]
+
+    # Highest score first; earlier sentences win ties
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    chosen = []
+    used = 0
+    for score, idx, sentence in scored:
+        cost = count_tokens(sentence)
+        if used + cost > max_tokens:
+            if not chosen:
+                # The best sentence alone is bigger than the budget: keep what fits of it
+                chosen.append((idx, truncate_to_tokens(sentence, max_tokens)))
+            break
+        chosen.append((idx, sentence))
+        used += cost
+
+    return " ".join(sentence for _, sentence in sorted(chosen))
+
+
+def summarise_turn(content: str, max_tokens: int = 40) -> str:
+    """Compress an older conversation turn to its leading sentences."""
+    summary = ""
+    for sentence in split_sentences(content):
+        candidate = f"{summary} {sentence}".strip()
+        if count_tokens(candidate) > max_tokens:
+            break
+        summary = candidate
+    return summary or truncate_to_tokens(content, max_tokens)
+
+
+def format_history(history: List[Dict], max_tokens: int, keep_recent: int = 2, summary_tokens: int = 40) -> str:
+    """
+    Render conversation history within max_tokens.
+
+    The first user turn (the original job description) and the last
+    `keep_recent` messages are kept verbatim; turns in between are summarised.
+    When that overflows, the kept messages are truncated first, sharing the
+    budget fairly. Summaries are only dropped, oldest first, once the kept
+    messages would get less than `summary_tokens` each. Kept messages are
+    only left out when the budget cannot fit even their role labels.
+    """
+    if max_tokens <= 0 or not history:
+        return ""
+
+    first_user = next((i for i, msg in enumerate(history) if msg["role"] == "user"), None)
+    recent_start = max(len(history) - keep_recent, 0)
+    kept = [i for i in range(len(history)) if i >= recent_start or i == first_user]
+    summaries = {
+        i: summarise_turn(history[i]["content"], summary_tokens)
+        for i in range(len(history))
+        if i not in kept
+    }
+
+    def label(i):
+        return f"{history[i]['role'].capitalize()}: "
+
+    def line_cost(i, content):
+        return count_tokens(label(i) + content)
+
+    needs = [count_tokens(history[i]["content"]) for i in kept]
+    kept_budget = max_tokens - sum(line_cost(i, s) for i, s in summaries.items())
+    kept_budget -= sum(count_tokens(label(i)) for i in kept)
+
+    floor = sum(min(need, summary_tokens) for need in needs)
+    for i in sorted(summaries):
+        if kept_budget >= floor:
+            break
+        kept_budget += line_cost(i, summaries.pop(i))
+
+    contents = dict(summaries)
+    for i, share in zip(kept, fair_shares(needs, kept_budget)):
+        contents[i] = truncate_to_tokens(history[i]["content"], share)
+
+    lines = [f"{label(i)}{contents[i]}" for i in sorted(contents) if contents[i]]
+    return "\n".join(lines)
+
+
+# -----------------------------
+# Prompt Builder
+# -----------------------------
+class PromptBuilder:
+    """
+    Assemble a prompt from a template with {history}, {job_description} and
+    {context} slots so that the whole thing stays within total_budget tokens.
+
+    The fixed template is paid for first. `context_share` of the remainder is
+    reserved for resume context and `history_share` for history (each only as
+    much as it actually needs). The job description may use everything
+    else, so it is only cut when the prompt would really overflow. History
+    then takes what the job description left over, and the resume context
+    gets the rest, spread across chunks in retrieval order.
+    """
+
+    def __init__(
+        self,
+        template: str,
+        total_budget: int = DEFAULT_TOKEN_BUDGET,
+        history_share: float = 0.2,
+        context_share: float = 0.5,
+        keep_recent: int = 2,
+    ):
+        self.template = template
+        self.total_budget = total_budget
+        self.history_share = history_share
+        self.context_share = context_share
+        self.keep_recent = keep_recent
+        self.template_tokens = count_tokens(template.format(history="", job_description="", context=""))
+
+    def format_chunks(self, chunks, query: str, max_tokens: int) -> str:
+        context = ""
+        remaining = max_tokens
+        for i, c in enumerate(chunks):
+            header = f"[Resume {c.resume_id}] (Category: {c.category}) — Similarity: {c.similarity:.4f}\n"
+            per_chunk = remaining // (len(chunks) - i) - count_tokens(header + CHUNK_SEPARATOR)
+            if per_chunk <= 0:
+                break
+            body = select_sentences(c.text.strip(), query, per_chunk)
+            block = header + body + CHUNK_SEPARATOR
+            context += block
+            remaining -= count_tokens(block)
+        return context
+
+    def build(self, job_description: str, history: List[Dict], chunks=None, context: Optional[str] = None) -> str:
+        available = max(self.total_budget - self.template_tokens, 0)
+
+        # The current question is already in job_description; don't send it twice
+        if history and history[-1]["role"] == "user" and history[-1]["content"] == job_description:
+            history = history[:-1]
+
+        # Reserve room for the resume context, but no more than it can actually use
+        if chunks is not None:
+            context_need = sum(count_tokens(self.format_chunks([c], job_description, available)) for c in chunks)
+        else:
+            context_need = count_tokens(context or "No previous context available")
+        flexible = available - min(context_need, int(available * self.context_share))
+        full_history = "\n".join(f"{msg['role'].capitalize()}: {msg['content']}" for msg in history)
+        history_reserve = min(count_tokens(full_history), int(available * self.history_share))
+
+        job_text = truncate_to_tokens(job_description, flexible - history_reserve)
+        history_text = format_history(history, flexible - count_tokens(job_text), self.keep_recent)
+
+        context_budget = available - count_tokens(job_text) - count_tokens(history_text)
+        if chunks is not None:
+            context = self.format_chunks(chunks, job_description, context_budget)
+        else:
+            context = truncate_to_tokens(context or "No previous context available", context_budget)
+
+        return self.template.format(history=history_text, job_description=job_text, context=context)
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from llm_client import LLMClient, TransientLLMError
+
+
+class FakeBackend:
+    name = "fake"
+    transient_errors = (TransientLLMError,)
+
+    def __init__(self, error=None, release=None):
+        self.error = error
+        self.release = release
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, caller="default"):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.release is not None:
+                self.release.wait(timeout=5)
+            if self.error is not None:
+                raise self.error
+            return {"text": f"answer to {prompt}", "prompt_tokens": 7, "output_tokens": 3}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for condition"
+        time.sleep(0.001)
+
+
+def test_identical_in_flight_prompts_are_coalesced():
+    release = threading.Event()
+    backend = FakeBackend(release=release)
+    client = LLMClient(backend=backend)
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(client.generate("same prompt", caller="rag")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: client.metrics().get("rag", {}).get("coalesced") == 4)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert backend.calls == 1
+    assert results == ["answer to same prompt"] * 5
+
+
+def test_concurrent_backend_calls_are_bounded():
+    release = threading.Event()
+    backend = FakeBackend(release=release)
+    client = LLMClient(backend=backend, max_concurrency=2)
+
+    threads = [threading.Thread(target=client.generate, args=(f"prompt {i}",)) for i in range(6)]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: backend.active == 2)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert backend.calls == 6
+    assert backend.max_active == 2
+
+
+def test_non_transient_errors_are_not_retried():
+    backend = FakeBackend(error=ValueError("400 InvalidArgument"))
+    client = LLMClient(backend=backend, max_retries=3, base_delay=0)
+
+    with pytest.raises(ValueError):
+        client.generate("prompt", caller="rag")
+
+    assert backend.calls == 1
+    assert client.metrics()["rag"]["retries"] == 0
+    assert client.metrics()["rag"]["errors"] == 1
+
+
+def test_transient_errors_are_retried_up_to_max_retries():
+    backend = FakeBackend(error=TransientLLMError("429 ResourceExhausted"))
+    client = LLMClient(backend=backend, max_retries=2, base_delay=0)
+
+    with pytest.raises(TransientLLMError):
+        client.generate("prompt", caller="rag")
+
+    assert backend.calls == 3
+    assert client.metrics()["rag"]["retries"] == 2
+
+
+def test_metrics_are_tracked_per_caller():
+    client = LLMClient(backend=FakeBackend())
+
+    client.generate("first", caller="rag_chatbot")
+    client.generate("second", caller="rag_chatbot")
+    client.generate("third", caller="metadata_extraction")
+
+    metrics = client.metrics()
+    assert metrics["rag_chatbot"]["calls"] == 2
+    assert metrics["rag_chatbot"]["prompt_tokens"] == 14
+    assert metrics["rag_chatbot"]["output_tokens"] == 6
+    assert metrics["metadata_extraction"]["calls"] == 1
+    assert metrics["metadata_extraction"]["errors"] == 0
+    assert metrics["rag_chatbot"]["latency_p50"] is not None
+    assert metrics["rag_chatbot"]["backend"] == "fake"
@@ -0,0 +1,94 @@
+from collections import namedtuple
+
+from prompt_builder import PromptBuilder, count_tokens, format_history, select_sentences
+
+TEMPLATE = "History:\n{history}\nJob:\n{job_description}\nContext:\n{context}\n"
+Chunk = namedtuple("Chunk", "resume_id category text similarity")
+
+JOB_DESCRIPTION = " ".join(f"Requirement {i}: experience with system number {i} in production." for i in range(1, 80))
+ANSWER = " ".join(f"Resume {i} matches several requirements." for i in range(1, 60))
+CHUNKS = [Chunk(i, "PDF", "Built production systems. Led a team of engineers.", 0.8) for i in range(5)]
+
+
+def test_first_turn_keeps_full_job_description_when_under_budget():
+    builder = PromptBuilder(TEMPLATE, total_budget=3000)
+    history = [{"role": "user", "content": JOB_DESCRIPTION}]
+
+    prompt = builder.build(JOB_DESCRIPTION, history, chunks=CHUNKS)
+
+    assert count_tokens(prompt) <= 3000
+    assert "Requirement 79" in prompt
+
+
+def test_follow_up_keeps_original_job_description():
+    builder = PromptBuilder(TEMPLATE, total_budget=3000)
+    history = [
+        {"role": "user", "content": JOB_DESCRIPTION},
+        {"role": "assistant", "content": ANSWER},
+        {"role": "user", "content": "Which of them knows Python?"},
+    ]
+
+    prompt = builder.build("Which of them knows Python?", history, chunks=CHUNKS)
+
+    assert count_tokens(prompt) <= 3000
+    assert "Requirement 1:" in prompt
+    assert "Resume 1 matches" in prompt
+
+
+def test_build_stays_within_budget_when_chunks_fill_their_share():
+    long_text = " ".join(
+        f"Deployed Python service {i} on AWS with Docker and monitored it in production." for i in range(200)
+    )
+    chunks = [Chunk(i, "Information-Technology", long_text, 0.8123) for i in range(5)]
+    history = [
+        {"role": "user", "content": JOB_DESCRIPTION},
+        {"role": "assistant", "content": ANSWER},
+        {"role": "user", "content": "Which of them knows Python, AWS and Docker?"},
+    ]
+
+    for budget in range(400, 3001, 97):
+        builder = PromptBuilder(TEMPLATE, total_budget=budget)
+        for job, turns in ((JOB_DESCRIPTION, history[:1]), (history[-1]["content"], history)):
+            prompt = builder.build(job, turns, chunks=chunks)
+            assert count_tokens(prompt) <= budget
+
+
+def test_format_history_truncates_before_dropping_kept_turns():
+    history = [
+        {"role": "user", "content": JOB_DESCRIPTION},
+        {"role": "assistant", "content": ANSWER},
+    ]
+
+    text = format_history(history, max_tokens=300)
+
+    assert count_tokens(text) <= 300
+    assert text.startswith("User: Requirement 1:")
+    assert "Assistant: Resume 1 matches" in text
+
+
+def test_select_sentences_prefers_relevant_sentences_over_filler():
+    text = (
+        "Loves cats. "
+        "Built large Python services for payment processing across several teams and regions. "
+        "Worked on AWS and Docker."
+    )
+
+    relevant = count_tokens(text) - count_tokens("Loves cats.")
+
+    selected = select_sentences(text, "Python AWS Docker engineer", max_tokens=relevant + 2)
+
+    assert "Loves cats" not in selected
+    assert "Python" in selected
+    assert "AWS and Docker" in selected
+
+
+def test_select_sentences_stops_at_first_sentence_that_does_not_fit():
+    text = (
+        "Built large Python services for payment processing across several teams and regions. "
+        "Loves cats. "
+        "Worked on AWS and Docker."
+    )
+
+    selected = select_sentences(text, "Python AWS Docker engineer", max_tokens=10)
+
+    assert selected == "Worked on AWS and Docker."